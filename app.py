@@ -2,13 +2,17 @@
 
 import streamlit as st
 import pandas as pd
-import json, re, io
-from typing import List, Dict
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+import numpy as np
+import io
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+from reportlab.platypus import SimpleDocTemplate, LongTable, TableStyle, Paragraph, Spacer
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet
 import os
 
+import powerscan_core as core
+
 # ---------------------------
 # Page config
 # ---------------------------
@@ -37,62 +41,30 @@ st.caption("An AI-powered baseline checker for web projects to detect unsafe pat
 # ---------------------------
 # Load patterns
 # ---------------------------
-with open("patterns.json", "r", encoding="utf-8") as f:
-    PATTERNS: List[Dict] = json.load(f)
+# The pattern tables live in powerscan_core (loaded once per process, so
+# pool workers share the same code path); only the warnings are UI-side.
+for _pid, _err in core.PATTERN_ERRORS:
+    st.warning(f"Skipping invalid pattern '{_pid}': {_err}")
 
-NAME_TO_ID = {p["name"]: p["id"] for p in PATTERNS}
-ID_TO_PATTERN = {p["id"]: p for p in PATTERNS}
+PATTERNS, NAME_TO_ID, ID_TO_PATTERN = core.PATTERNS, core.NAME_TO_ID, core.ID_TO_PATTERN
 
 # ---------------------------
 # Helper functions
 # ---------------------------
-def decode_bytes(raw: bytes) -> str:
-    try:
-        return raw.decode("utf-8")
-    except:
-        return raw.decode("utf-8", errors="replace")
-
-def find_matches(text: str, regex: str):
-    try:
-        return list(re.finditer(regex, text, re.IGNORECASE | re.MULTILINE))
-    except re.error:
-        return []
-
-def highlight_patterns(text: str, selected_patterns: list) -> str:
-    highlighted = text
-    for pat in selected_patterns:
-        try:
-            regex = re.compile(pat["regex"], re.IGNORECASE)
-            highlighted = regex.sub(
-                lambda m: f"<mark style='background:yellow;color:black;'>{m.group(0)}</mark>",
-                highlighted
-            )
-        except re.error:
-            pass
-    return highlighted
-
-def scan_text(text: str, pattern_ids: List[str]):
-    findings = []
-    for pid in pattern_ids:
-        pat = ID_TO_PATTERN[pid]
-        matches = find_matches(text, pat["regex"])
-        if matches:
-            lines = sorted({text.count("\n", 0, m.start()) + 1 for m in matches})
-            snippet = text[matches[0].start():matches[0].end()+80]
-            findings.append({
-                "Feature": pat["name"],
-                "Severity": pat["severity"],
-                "Count": len(matches),
-                "Lines": ", ".join(map(str, lines)),
-                "Snippet": snippet.strip()
-            })
-    return findings
-
-def scan_file(file, pattern_ids: List[str]):
-    raw = file.read()
-    text = decode_bytes(raw)
-    findings = scan_text(text, pattern_ids)
-    return file.name, round(len(raw)/1024,2), findings, text
+@st.cache_data(show_spinner=False, max_entries=64)
+def scan_bytes(raw: bytes, name: str, pattern_ids: Tuple[str, ...]):
+    """Scan one file's bytes. Cached on (content, selection), so Streamlit
+    reruns from unrelated widget toggles skip the decode and regex work."""
+    return core.scan_payload((raw, name, pattern_ids))
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def scan_batch(jobs: List[Tuple[bytes, str, Tuple[str, ...]]]):
+    """Scan a multi-file batch on a process pool. The stdlib regex engine
+    holds the GIL, so threads don't overlap CPU-bound scans — separate
+    processes do. Workers import powerscan_core, never this script, and
+    the cached result means the pool only spins up when inputs change."""
+    with ProcessPoolExecutor(max_workers=min(os.cpu_count() or 2, len(jobs))) as ex:
+        return list(ex.map(core.scan_payload, jobs))
 
 # ---------------------------
 # Sidebar settings
@@ -115,33 +87,62 @@ uploaded_files = st.file_uploader(
     type=["html","css","js"], accept_multiple_files=True
 )
 
+_FINDING_COLUMNS = ("Feature", "Severity", "Count", "Lines", "Snippet")
+
 if uploaded_files:
-    all_findings_list = []
     summary_rows = []
-    severity_chart_data = []
     chart_data = []
 
-    for file in uploaded_files:
-        name, size_kb, findings, text = scan_file(file, selected_pattern_ids)
-        total_findings = sum(f["Count"] for f in findings)
+    # getvalue() returns the UploadedFile's underlying buffer without
+    # moving the stream position, so reruns never see a drained file.
+    payloads = [(file.getvalue(), file.name) for file in uploaded_files]
+    pattern_key = tuple(selected_pattern_ids)
+
+    # Each file scans independently, so fan multi-file batches out over a
+    # process pool and keep the Streamlit rendering below single-threaded.
+    if len(payloads) > 1:
+        results = scan_batch([(raw, name, core.applicable_ids(name, pattern_key)) for raw, name in payloads])
+    else:
+        results = [scan_bytes(raw, name, core.applicable_ids(name, pattern_key)) for raw, name in payloads]
+
+    # Accumulate findings column-wise (structure-of-arrays) and build one
+    # DataFrame up front; per-file tables below are cheap boolean masks
+    # over it instead of one small DataFrame construction per file.
+    findings_columns = {"File": [], **{c: [] for c in _FINDING_COLUMNS}}
+    # Row range of each file's findings in the combined frame. Expanders
+    # are keyed by upload position, not display name — the uploader allows
+    # two files with the same name, and those must not share a table.
+    file_row_slices = []
+    for result in results:
+        row_start = len(findings_columns["File"])
+        for f in result["findings"]:
+            findings_columns["File"].append(result["name"])
+            for c in _FINDING_COLUMNS:
+                findings_columns[c].append(f[c])
+        file_row_slices.append(slice(row_start, len(findings_columns["File"])))
+    # Combined findings across all files; charts and reports derive from it.
+    all_findings_df = pd.DataFrame(findings_columns)
+
+    for result, (raw, _), file_rows in zip(results, payloads, file_row_slices):
+        name, size_kb, findings = result["name"], result["size_kb"], result["findings"]
+        total_findings = result["total"]
         summary_rows.append({"File": name, "Size (KB)": size_kb, "Findings": total_findings})
         chart_data.append({"File": name, "Total": total_findings})
 
-        sev_counts = {}
-        for f in findings:
-            sev_counts[f["Severity"]] = sev_counts.get(f["Severity"], 0) + f["Count"]
-        for sev, cnt in sev_counts.items():
-            severity_chart_data.append({"File": name, "Severity": sev, "Count": cnt})
-
         with st.expander(f"{name} — {size_kb} KB — {total_findings} findings"):
             if findings:
-                df = pd.DataFrame(findings)
-                all_findings_list.append(df)
-
-                def color_severity(val):
-                    return f"color: {'red' if val=='major' else 'orange'}; font-weight:bold;"
+                df = all_findings_df.iloc[file_rows][list(_FINDING_COLUMNS)]
+
+                def color_severity(col):
+                    # One vectorized pass over the column instead of a
+                    # Python callback per cell (applymap).
+                    return np.where(
+                        col.values == "major",
+                        "color: red; font-weight:bold;",
+                        "color: orange; font-weight:bold;",
+                    )
 
-                st.dataframe(df.style.applymap(color_severity, subset=["Severity"]))
+                st.dataframe(df.style.apply(color_severity, subset=["Severity"]))
 
                 if show_snippets:
                     for row in findings:
@@ -149,9 +150,9 @@ if uploaded_files:
                         st.code(row["Snippet"], language="html")
 
                 if show_highlighted_code:
-                    st.markdown("### Highlighted Source Code")
-                    highlighted_html = highlight_patterns(
-                        text, [ID_TO_PATTERN[pid] for pid in selected_pattern_ids]
+                    st.markdown("### Highlighted Matches")
+                    highlighted_html = core.highlight_matches(
+                        raw, core.applicable_ids(name, pattern_key)
                     )
                     st.markdown(
                         "<div style='overflow:auto; max-height:400px; border:1px solid #ddd; padding:10px;'>"
@@ -172,10 +173,13 @@ if uploaded_files:
         chart_df = pd.DataFrame(chart_data)
         st.bar_chart(chart_df.set_index("File"))
     else:
-        sev_df = pd.DataFrame(severity_chart_data)
-        if not sev_df.empty:
-            pivot_df = sev_df.pivot_table(
-                index="File", columns="Severity", values="Count", aggfunc="sum", fill_value=0
+        if not all_findings_df.empty:
+            # Single vectorized aggregation over the combined frame —
+            # no intermediate long-form list or second pivot pass.
+            pivot_df = (
+                all_findings_df.groupby(["File", "Severity"], sort=False)["Count"]
+                .sum()
+                .unstack(fill_value=0)
             )
             st.bar_chart(pivot_df)
         else:
@@ -184,9 +188,10 @@ if uploaded_files:
     # ---------------------------
     # Downloads (JSON / CSV / Excel / PDF)
     # ---------------------------
-    if all_findings_list:
-        all_findings_df = pd.concat(all_findings_list, ignore_index=True)
-        all_findings_df.to_json("scan_results.json", orient="records", indent=2)
+    if not all_findings_df.empty:
+        # Columnar handoff to the Dashboard page: parquet round-trips much
+        # faster than JSON and keeps dtypes (pyarrow ships with Streamlit).
+        all_findings_df.to_parquet("scan_results.parquet", index=False)
 
         st.markdown("### ⬇️ Download Reports")
         st.download_button(
@@ -201,12 +206,9 @@ if uploaded_files:
             file_name="scan_results.csv"
         )
 
-        excel_buffer = io.BytesIO()
-        with pd.ExcelWriter(excel_buffer, engine="openpyxl") as writer:
-            all_findings_df.to_excel(writer, index=False, sheet_name="Scan Results")
         st.download_button(
             label="📥 Download Excel Report",
-            data=excel_buffer.getvalue(),
+            data=core.to_excel_bytes(all_findings_df),
             file_name="scan_results.xlsx",
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         )
@@ -215,8 +217,15 @@ if uploaded_files:
         doc = SimpleDocTemplate(pdf_buffer)
         styles = getSampleStyleSheet()
         story = [Paragraph("Scan Results", styles["Title"]), Spacer(1, 12)]
-        data = [list(all_findings_df.columns)] + all_findings_df.values.tolist()
-        table = Table(data)
+        # Pre-stringify cells so ReportLab doesn't coerce them one by one;
+        # LongTable paginates incrementally instead of laying out the whole
+        # table in one pass, which matters once findings run into hundreds.
+        # Snippets are capped for the PDF and column widths are fixed so
+        # ReportLab skips its O(rows x cols) auto-sizing measurement pass.
+        pdf_df = all_findings_df.astype(str)
+        pdf_df["Snippet"] = pdf_df["Snippet"].str.slice(0, 60)
+        data = [list(pdf_df.columns)] + pdf_df.values.tolist()
+        table = LongTable(data, colWidths=[70, 80, 45, 35, 60, 170], repeatRows=1)
         table.setStyle(TableStyle([
             ("BACKGROUND", (0,0), (-1,0), colors.grey),
             ("TEXTCOLOR", (0,0), (-1,0), colors.whitesmoke),
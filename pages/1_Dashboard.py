@@ -15,14 +15,47 @@ if st.button("🔄 Refresh Data"):
 # ---------------------------
 # Load last scan results
 # ---------------------------
-if os.path.exists("scan_results.json"):
-    with open("scan_results.json", "r", encoding="utf-8") as f:
-        data = json.load(f)
-    df = pd.DataFrame(data)
+@st.cache_data(show_spinner=False)
+def load_results(path: str, mtime: float) -> pd.DataFrame:
+    # mtime is part of the cache key, so the file is only re-read when a
+    # new scan actually rewrote it.
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    with open(path, "r", encoding="utf-8") as f:
+        return pd.DataFrame(json.load(f))
+
+if os.path.exists("scan_results.parquet"):
+    results_path = "scan_results.parquet"
+elif os.path.exists("scan_results.json"):
+    # Legacy handoff format from older scans.
+    results_path = "scan_results.json"
 else:
-    st.info("⚠️ No scan_results.json found yet. Run a scan on the main page first.")
+    st.info("⚠️ No scan results found yet. Run a scan on the main page first.")
     st.stop()
 
+df = load_results(results_path, os.path.getmtime(results_path))
+
+# ---------------------------
+# Cached aggregations — recomputed only when the results frame changes,
+# not on every refresh/rerun.
+# ---------------------------
+@st.cache_data(show_spinner=False)
+def feature_counts(df: pd.DataFrame) -> pd.Series:
+    return df.groupby("Feature")["Count"].sum().sort_values(ascending=False)
+
+@st.cache_data(show_spinner=False)
+def top5_features(df: pd.DataFrame) -> pd.Series:
+    return (
+        df.groupby(["Feature", "Severity"])["Count"]
+        .sum()
+        .sort_values(ascending=False)
+        .head(5)
+    )
+
+@st.cache_data(show_spinner=False)
+def severity_counts(df: pd.DataFrame) -> pd.Series:
+    return df.groupby("Severity")["Count"].sum()
+
 # ---------------------------
 # Summary Table
 # ---------------------------
@@ -34,26 +67,18 @@ st.dataframe(df)
 # ---------------------------
 if not df.empty:
     st.subheader("Findings by Feature")
-    feature_counts = df.groupby("Feature")["Count"].sum().sort_values(ascending=False)
-    st.bar_chart(feature_counts)
+    st.bar_chart(feature_counts(df))
 
 # ---------------------------
 # Top 5 Risky Features
 # ---------------------------
 st.subheader("Top 5 Risky Features (by count)")
-top5 = (
-    df.groupby(["Feature", "Severity"])["Count"]
-    .sum()
-    .sort_values(ascending=False)
-    .head(5)
-)
-st.table(top5)
+st.table(top5_features(df))
 
 # ---------------------------
 # Chart: Severity Distribution
 # ---------------------------
 st.subheader("Severity Distribution")
-severity_counts = df.groupby("Severity")["Count"].sum()
-st.bar_chart(severity_counts)
+st.bar_chart(severity_counts(df))
 
 st.success("✅ Dashboard loaded successfully!")
@@ -0,0 +1,264 @@
+# powerscan_core.py — PowerScan scanning engine (no Streamlit imports)
+#
+# Lives outside app.py so ProcessPoolExecutor workers can import the
+# scanner without re-executing the Streamlit script.
+
+import html
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Prefer google-re2 when available: it compiles to a DFA and scans in
+# guaranteed linear time, so hostile uploads cannot trigger catastrophic
+# backtracking. Falls back to the stdlib engine if re2 is not installed.
+try:
+    import re2 as _re2
+except ImportError:
+    _re2 = None
+
+
+def _compile(pattern):
+    """Compile a scan pattern, case-insensitive and multiline, on re2 when
+    it is installed, falling back to stdlib re if re2 is missing or
+    rejects the pattern."""
+    if _re2 is not None:
+        # google-re2 takes an re2.Options, not stdlib flags; there is no
+        # multiline option field, so that flag rides along inline.
+        options = _re2.Options()
+        options.case_sensitive = False
+        prefix = b"(?m)" if isinstance(pattern, bytes) else "(?m)"
+        try:
+            return _re2.compile(prefix + pattern, options=options)
+        except Exception:
+            pass
+    return re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+
+PATTERNS_FILE = os.path.join(os.path.dirname(__file__), "patterns.json")
+
+_REGEX_SPECIALS = set("[](){}|?*+^$.")
+
+
+def _longest_literal(regex: str) -> bytes:
+    """Best-effort longest fixed substring of a regex, lowercased bytes.
+
+    Escaped punctuation counts as literal; metacharacters and character
+    classes (\\s, \\b, ...) break the run, and a quantifier that can match
+    zero times (?, *, {...}) also evicts the atom before it — 'https?'
+    must yield 'http', or the prefilter would drop files that only
+    contain 'http://'. Returns b"" when no run of at least 3 characters
+    exists, meaning "no useful prefilter"."""
+    # Alternation and groups change which atoms are guaranteed to appear
+    # in a match ('foo|bar' guarantees neither branch, '(abc)?' nothing at
+    # all), and '(?:' would otherwise read as literal text. Scoping those
+    # correctly isn't worth it for a prefilter — such patterns simply
+    # aren't prefiltered. This is deliberately conservative: '|' or '('
+    # inside a character class also disables the prefilter.
+    i = 0
+    while i < len(regex):
+        if regex[i] == "\\":
+            i += 2
+            continue
+        if regex[i] in "|(":
+            return b""
+        i += 1
+    runs = [[]]
+    i = 0
+    while i < len(regex):
+        ch = regex[i]
+        if ch == "\\" and i + 1 < len(regex):
+            nxt = regex[i + 1]
+            if nxt.isalnum():
+                runs.append([])  # \b, \s, \d, ... — not a literal
+            else:
+                runs[-1].append(nxt)  # escaped punctuation is literal
+            i += 2
+            continue
+        if ch in "?*{":
+            # The preceding character may be optional (or part of an
+            # interval repeat) — it is not a guaranteed literal.
+            if runs[-1]:
+                runs[-1].pop()
+            runs.append([])
+            if ch == "{":
+                # Skip the interval body so its digits aren't taken as text.
+                end = regex.find("}", i)
+                i = end + 1 if end != -1 else len(regex)
+                continue
+        elif ch in _REGEX_SPECIALS:
+            runs.append([])
+        else:
+            runs[-1].append(ch)
+        i += 1
+    literal = "".join(max(runs, key=len))
+    if len(literal) < 3:
+        return b""
+    return literal.lower().encode("utf-8")
+
+
+def load_patterns():
+    """Parse patterns.json, validate every regex, and build the lookup
+    tables. Returns (patterns, name_to_id, id_to_pattern, errors) where
+    errors lists (pattern_id, message) for regexes that failed to parse —
+    the UI decides how to surface those."""
+    with open(PATTERNS_FILE, "r", encoding="utf-8") as f:
+        loaded: List[Dict] = json.load(f)
+    # Every scan and highlight runs through the cached combined pattern
+    # from build_combined, so the compile here is validation only: bad
+    # patterns are rejected once, at load, instead of being swallowed by
+    # try/except on every scan.
+    patterns = []
+    errors = []
+    for p in loaded:
+        try:
+            re.compile(p["regex"], re.IGNORECASE | re.MULTILINE)
+        except re.error as e:
+            errors.append((p["id"], str(e)))
+            continue
+        p["_literal"] = _longest_literal(p["regex"])
+        patterns.append(p)
+    name_to_id = {p["name"]: p["id"] for p in patterns}
+    id_to_pattern = {p["id"]: p for p in patterns}
+    return patterns, name_to_id, id_to_pattern, errors
+
+
+# Loaded at import: each process (main app or pool worker) pays this once.
+PATTERNS, NAME_TO_ID, ID_TO_PATTERN, PATTERN_ERRORS = load_patterns()
+
+
+@lru_cache(maxsize=64)
+def build_combined(pattern_ids: Tuple[str, ...]):
+    """Fuse the selected patterns into one alternation regex.
+
+    Scanning N patterns separately walks the text N times; one combined
+    `(?P<id0>...)|(?P<id1>...)` pattern walks it once and we dispatch on
+    `lastgroup`. Cached per selection so it is only rebuilt when the
+    selection changes.
+    """
+    parts = []
+    group_to_id = {}
+    for pid in pattern_ids:
+        safe = re.sub(r"\W", "_", pid)
+        group_to_id[safe] = pid
+        # Non-capturing wrap keeps each alternative self-contained, so a
+        # top-level '|' inside one pattern can't bleed into its neighbours.
+        parts.append(f"(?P<{safe}>(?:{ID_TO_PATTERN[pid]['regex']}))")
+    # Compiled as a bytes pattern: the scan runs on the raw upload buffer,
+    # skipping a full UTF-8 decode pass (all shipped patterns are ASCII).
+    return _compile("|".join(parts).encode("utf-8")), group_to_id
+
+
+def applicable_ids(name: str, pattern_ids: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Keep only the patterns whose group matches the file's extension —
+    no point scanning a .css file for JS-only features."""
+    ext = os.path.splitext(name)[1].lstrip(".").lower()
+    group = "html" if ext == "htm" else ext
+    if group not in ("html", "css", "js"):
+        return pattern_ids
+    return tuple(pid for pid in pattern_ids if ID_TO_PATTERN[pid]["group"] == group)
+
+
+def scan_raw(raw: bytes, pattern_ids):
+    findings = []
+    if not pattern_ids:
+        return findings
+    # Cheap literal prefilter: most patterns carry a fixed substring, and a
+    # memchr-backed bytes search over a lowercased copy is an order of
+    # magnitude cheaper than the regex engine — patterns whose literal is
+    # absent are dropped before the combined pattern is even built.
+    lowered = raw.lower()
+    kept = []
+    for pid in pattern_ids:
+        literal = ID_TO_PATTERN[pid]["_literal"]
+        if not literal or literal in lowered:
+            kept.append(pid)
+    pattern_ids = kept
+    if not pattern_ids:
+        return findings
+    combined, group_to_id = build_combined(tuple(pattern_ids))
+    buckets = {}
+    for m in combined.finditer(raw):
+        group = m.lastgroup
+        if isinstance(group, bytes):
+            # google-re2 reports group names of bytes patterns as bytes.
+            group = group.decode("ascii")
+        buckets.setdefault(group_to_id[group], []).append(m)
+    # One vectorized pass for newline offsets; matches then map to lines
+    # with a batched binary search instead of re-counting "\n" per match.
+    newline_offsets = np.flatnonzero(np.frombuffer(raw, dtype=np.uint8) == 0x0A)
+    # Snippets decode straight from a view of the buffer, skipping the
+    # intermediate bytes copy a plain raw[s:e] slice would allocate.
+    view = memoryview(raw)
+    for pid in pattern_ids:
+        pat = ID_TO_PATTERN[pid]
+        matches = buckets.get(pid)
+        if matches:
+            starts = np.fromiter((m.start() for m in matches), dtype=np.int64, count=len(matches))
+            lines = np.unique(np.searchsorted(newline_offsets, starts) + 1).tolist()
+            # Only the displayed snippet window is decoded, not the file.
+            snippet = str(view[matches[0].start():matches[0].end() + 80], "utf-8", "replace")
+            findings.append({
+                "Feature": pat["name"],
+                "Severity": pat["severity"],
+                "Count": len(matches),
+                "Lines": ", ".join(map(str, lines)),
+                "Snippet": snippet.strip()
+            })
+    return findings
+
+
+def highlight_matches(raw: bytes, pattern_ids: Tuple[str, ...], context: int = 80) -> str:
+    """Render a small window around each match instead of shipping the whole
+    marked-up file to the browser — output scales with the number of
+    matches, not the file size.
+
+    One pass of the combined pattern finds every match, and each window is
+    HTML-escaped before the <mark> wrapper goes in, so uploaded markup can
+    never execute inside the unsafe_allow_html block.
+    """
+    if not pattern_ids:
+        return ""
+    combined, _ = build_combined(tuple(pattern_ids))
+    windows = []
+    for m in combined.finditer(raw):
+        s, e = m.start(), m.end()
+        before = html.escape(raw[max(0, s - context):s].decode("utf-8", "replace"))
+        matched = html.escape(raw[s:e].decode("utf-8", "replace"))
+        after = html.escape(raw[e:e + context].decode("utf-8", "replace"))
+        windows.append(
+            f"{before}<mark style='background:yellow;color:black;'>{matched}</mark>{after}"
+        )
+    return "\n ··· \n".join(windows)
+
+
+def to_excel_bytes(findings_df) -> bytes:
+    """Serialize a findings DataFrame to .xlsx bytes with xlsxwriter.
+
+    Plain (buffered) mode on purpose: constant_memory discards writes to
+    already-flushed rows, and pandas emits cells column by column, so that
+    combination silently blanks most of the sheet.
+    """
+    import io
+
+    import pandas as pd
+
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
+        findings_df.to_excel(writer, index=False, sheet_name="Scan Results")
+    return buffer.getvalue()
+
+
+def scan_payload(job: Tuple[bytes, str, Tuple[str, ...]]):
+    """Top-level pickleable worker: scan one (raw, name, pattern_ids) job."""
+    raw, name, pattern_ids = job
+    findings = scan_raw(raw, pattern_ids)
+    return {
+        "name": name,
+        "size_kb": round(len(raw) / 1024, 2),
+        "findings": findings,
+        # Stored once so reruns don't re-sum the findings per interaction.
+        "total": sum(f["Count"] for f in findings),
+    }
@@ -0,0 +1,90 @@
+# test_powerscan_core.py — tests for the scanning engine (run with pytest)
+
+import pytest
+
+import powerscan_core as core
+
+ALL_IDS = tuple(p["id"] for p in core.PATTERNS)
+
+
+def test_scan_payload_counts_lines_and_total():
+    raw = b"x\nalert(1)\ny\nalert(2) alert(3)\n"
+    result = core.scan_payload((raw, "a.js", ("alert",)))
+    assert result["total"] == 3
+    finding = result["findings"][0]
+    assert finding["Feature"] == "Alert()"
+    assert finding["Count"] == 3
+    assert finding["Lines"] == "2, 4"
+
+
+def test_scan_is_case_insensitive():
+    findings = core.scan_raw(b"ALERT(1)", ("alert",))
+    assert findings and findings[0]["Count"] == 1
+
+
+def test_group_filter_skips_inapplicable_patterns():
+    assert core.applicable_ids("a.css", ALL_IDS) == ("grid_template",)
+    # eval( in a .css file is not a CSS pattern, so nothing should match
+    assert core.scan_raw(b"eval(x)", core.applicable_ids("a.css", ALL_IDS)) == []
+
+
+def test_highlight_matches_escapes_html():
+    out = core.highlight_matches(b"<b>x</b> alert(1)", ("alert",))
+    assert "<mark" in out
+    assert "&lt;b&gt;" in out
+    assert "<b>" not in out
+
+
+def test_literal_extractor_basics():
+    assert core._longest_literal(r"grid-template") == b"grid-template"
+    assert core._longest_literal(r"\bconsole\.log\s*\(") == b"console.log"
+    assert core._longest_literal(r"<video\b") == b"<video"
+    # too short to be a useful prefilter
+    assert core._longest_literal(r"ab\s*c") == b""
+
+
+def test_literal_extractor_drops_optional_atoms():
+    # the 's' can match zero times, so it must not be part of the literal
+    assert core._longest_literal(r"https?://") == b"http"
+    assert core._longest_literal(r"colou?r") == b"colo"
+    assert core._longest_literal(r"xy*z{2,3}w") == b""
+
+
+def test_literal_extractor_bails_on_alternation_and_groups():
+    # neither branch of an alternation is a guaranteed substring
+    assert core._longest_literal(r"foo|bar") == b""
+    assert core._longest_literal(r"foobar|baz") == b""
+    # '(?:' must not be read as literal text
+    assert core._longest_literal(r"(?:abcd)ef") == b""
+    # an optional group makes its whole content non-guaranteed
+    assert core._longest_literal(r"(abc)?def") == b""
+    # escaped parens/pipe stay literal
+    assert core._longest_literal(r"foo\(bar\|baz") == b"foo(bar|baz"
+
+
+def test_excel_export_round_trips():
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("xlsxwriter")
+    pytest.importorskip("openpyxl")  # reader side only
+    import io
+
+    df = pd.DataFrame({
+        "File": ["a.js", "a.js", "b.css"],
+        "Feature": ["Alert()", "eval() function", "CSS Grid"],
+        "Severity": ["minor", "major", "major"],
+        "Count": [2, 1, 3],
+        "Lines": ["1, 4", "2", "7"],
+        "Snippet": ["alert(1)", "eval(x)", "grid-template: a"],
+    })
+    out = pd.read_excel(io.BytesIO(core.to_excel_bytes(df)), sheet_name="Scan Results")
+    # every cell must survive the round trip, not just the first column
+    assert out.astype(str).equals(df.astype(str))
+
+
+def test_re2_engine_is_used_when_installed():
+    pytest.importorskip("re2")
+    combined, _ = core.build_combined(("alert", "video_tag"))
+    assert type(combined).__module__.startswith("re2")
+    # case-insensitivity and lastgroup dispatch must hold under re2 too
+    findings = core.scan_raw(b"<VIDEO x>\nAlErT(1)", ("alert", "video_tag"))
+    assert {f["Feature"] for f in findings} == {"Alert()", "<video> tag"}